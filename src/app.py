@@ -1,15 +1,38 @@
 import streamlit as st
 import pandas as pd
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import folium_static
 from folium.plugins import HeatMap
 from model import LaunchImpactModel
-from weather_integration import LaunchWeatherAnalyzer
+from weather_integration import get_analyzer, DISTANCES
 import numpy as np
 
-model = LaunchImpactModel()
-weather_analyzer = LaunchWeatherAnalyzer()
-model.load_models()
+@st.cache_resource
+def get_model():
+    m = LaunchImpactModel()
+    m.load_models()
+    return m
+
+model = get_model()
+weather_analyzer = get_analyzer()
+rng = np.random.default_rng()
+
+@st.cache_data(max_entries=64)
+def cached_predict(payload_mass, latitude, longitude, rocket_type, fuel_type, duration_hours):
+    input_data = pd.DataFrame({
+        'payload_mass': [payload_mass],
+        'launch_site_lat': [latitude],
+        'launch_site_lon': [longitude],
+        'rocket_type': [rocket_type],
+        'fuel_type': [fuel_type]
+    })
+    return model.predict(input_data, duration_hours=duration_hours)
+
+@st.cache_data(max_entries=3 * 8)
+def render_heatmap_html(points, lat, lon):
+    m = folium.Map(location=[lat, lon], zoom_start=8)
+    HeatMap(points, radius=20, blur=15, max_zoom=1).add_to(m)
+    return m.get_root().render()
 
 st.title("ASCENT: Aerospace System for Chemical Emissions & Numerical Tracking")
 st.sidebar.header("Launch Input Parameters")
@@ -28,52 +51,38 @@ if "pollutant_data" not in st.session_state:
 
 if st.sidebar.button("Run Simulation"):
 
-    input_data = pd.DataFrame({
-        'payload_mass': [payload_mass],
-        'launch_site_lat': [latitude],
-        'launch_site_lon': [longitude],
-        f'rocket_type_{rocket_type}': [1],
-        f'fuel_type_{fuel_type}': [1]
-    })
+    emissions = cached_predict(payload_mass, latitude, longitude, rocket_type, fuel_type, sim_duration)
+    jitter = rng.uniform(1.0, 1.3, size=3)
+    emissions['co2'] *= (payload_mass / 4000) ** 1.2 * jitter[0]
+    emissions['nox'] *= (1.5 if fuel_type == "RP-1/LOX" else 1.0) * jitter[1]
+    emissions['al2o3'] *= (2.0 if fuel_type == "Solid" else 0.8) * jitter[2]
     
-    emissions = model.predict(input_data, duration_hours=sim_duration)
-    emissions['co2'] *= (payload_mass / 4000) ** 1.2 * np.random.uniform(1.0, 1.3)
-    emissions['nox'] *= (1.5 if fuel_type == "RP-1/LOX" else 1.0) * np.random.uniform(1.0, 1.3)
-    emissions['al2o3'] *= (2.0 if fuel_type == "Solid" else 0.8) * np.random.uniform(1.0, 1.3)
+    # Dispersion is linear in the emission rate, so analyse at unit rate and scale per run.
+    results = weather_analyzer.analyze_launch_conditions(latitude, longitude, {'co2': 1.0, 'nox': 1.0, 'al2o3': 1.0})
+    rates = np.array([emissions[pollutant].sum() for pollutant in results['pollutants']], dtype=np.float32)
     
-    results = weather_analyzer.analyze_launch_conditions(latitude, longitude, {
-        'co2': emissions['co2'].sum(),
-        'nox': emissions['nox'].sum(),
-        'al2o3': emissions['al2o3'].sum()
-    })
-    
-    dispersion_data = results['dispersion_patterns']
+    concentrations = rates[:, None, None, None] * results['concentrations']
     weather_info = results['weather']
     
     wind_speed = weather_info.wind_speed * 1.5  
     wind_direction = weather_info.wind_direction  
-    heatmap_data = {pollutant: [] for pollutant in dispersion_data.keys()}
-    
-    for pollutant, time_data in dispersion_data.items():
-        for hour, distance_data in time_data.items():
-            for distance, concentration_levels in distance_data.items():
-                for altitude, concentration in concentration_levels.items():
-                    try:
-                        dist_float = float(distance.rstrip('m'))
-                        decay_factor = 1 / (1 + dist_float / 500)  
-                        wind_adjustment_lat = dist_float * 0.0002 * np.cos(np.radians(wind_direction)) * wind_speed / 10
-                        wind_adjustment_lon = dist_float * 0.0002 * np.sin(np.radians(wind_direction)) * wind_speed / 10
-                        adjusted_lat = latitude + wind_adjustment_lat
-                        adjusted_lon = longitude + wind_adjustment_lon
-                        heatmap_data[pollutant].append([
-                            adjusted_lat,
-                            adjusted_lon,
-                            float(concentration) * decay_factor
-                        ])
-                    except (ValueError, TypeError, AttributeError):
-                        continue
-
-    st.session_state.simulation_results = results
+    distances = DISTANCES.astype(np.float64)
+    _, n_hours, n_distances, n_heights = concentrations.shape
+
+    k = 0.0002 * wind_speed / 10
+    lat_step = k * np.cos(np.radians(wind_direction))
+    lon_step = k * np.sin(np.radians(wind_direction))
+
+    adj_lat = np.broadcast_to((latitude + distances * lat_step)[:, None], (n_hours, n_distances, n_heights)).ravel()
+    adj_lon = np.broadcast_to((longitude + distances * lon_step)[:, None], (n_hours, n_distances, n_heights)).ravel()
+    values = concentrations / (1.0 + distances / 500.0)[:, None]
+
+    heatmap_data = {
+        pollutant: np.stack([adj_lat, adj_lon, values[i].ravel()], axis=1).tolist()
+        for i, pollutant in enumerate(results['pollutants'])
+    }
+
+    st.session_state.simulation_results = {**results, 'concentrations': concentrations}
     st.session_state.pollutant_data = heatmap_data
 
 if st.session_state.pollutant_data:
@@ -85,9 +94,10 @@ if st.session_state.pollutant_data:
     )
     
     st.subheader(f"Pollutant Dispersion Heatmap - {selected_pollutant.upper()}")
-    m = folium.Map(location=[latitude, longitude], zoom_start=8)
-    HeatMap(st.session_state.pollutant_data[selected_pollutant], radius=20, blur=15, max_zoom=1).add_to(m)
-    folium_static(m)
+    components.html(
+        render_heatmap_html(st.session_state.pollutant_data[selected_pollutant], latitude, longitude),
+        height=500
+    )
     
     weather_info = st.session_state.simulation_results['weather']
     st.subheader("Current Weather Conditions at Launch Site")
@@ -98,17 +108,20 @@ if st.session_state.pollutant_data:
     st.write(f"**Wind Direction:** {weather_info.wind_direction}°")
     st.write(f"**Cloud Cover:** {weather_info.cloud_cover}%")
     
+    pollutant_data = st.session_state.pollutant_data
+    counts = [len(data) for data in pollutant_data.values()]
+    buf = np.empty((sum(counts), 3), dtype=np.float64)
+    offset = 0
+    for data, count in zip(pollutant_data.values(), counts):
+        buf[offset:offset + count] = np.reshape(data, (count, 3))
+        offset += count
+
     df_dispersion = pd.DataFrame({
-        'Pollutant': [],
-        'Latitude': [],
-        'Longitude': [],
-        'Concentration': []
+        'Pollutant': np.repeat(list(pollutant_data.keys()), counts),
+        'Latitude': buf[:, 0].round(5),
+        'Longitude': buf[:, 1].round(5),
+        'Concentration': np.char.mod('%.6g', buf[:, 2])
     })
-    
-    for pollutant, data in st.session_state.pollutant_data.items():
-        temp_df = pd.DataFrame(data, columns=['Latitude', 'Longitude', 'Concentration'])
-        temp_df['Pollutant'] = pollutant
-        df_dispersion = pd.concat([df_dispersion, temp_df], ignore_index=True)
-    
+
     csv = df_dispersion.to_csv(index=False).encode('utf-8')
     st.download_button("Download Dispersion Data", csv, "dispersion_data.csv", "text/csv")
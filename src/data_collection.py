@@ -11,7 +11,7 @@ class LaunchDataCollector:
     
     def load_data(self) -> pd.DataFrame:
         try:
-            self.launch_data = pd.read_csv(self.csv_file, parse_dates=['date'])
+            self.launch_data = pd.read_csv(self.csv_file, engine='pyarrow', parse_dates=['date'])
             logger.info("Launch data successfully loaded from CSV.")
             return self.launch_data
         except Exception as e:
@@ -2,38 +2,56 @@ import joblib
 import os
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 
+ROCKET_TYPES = ['Ariane 5', 'Atlas V', 'Falcon 9', 'Soyuz', 'Electron']
+FUEL_TYPES = ['LH2/LOX', 'RP-1/LOX', 'Solid']
+CATEGORIES = {'rocket_type': ROCKET_TYPES, 'fuel_type': FUEL_TYPES}
+
 class LaunchImpactModel:
     def __init__(self):
         self.models = {}
         self.feature_columns = None  
+        self.categories = None
+
+    def _build_features(self, data: pd.DataFrame) -> np.ndarray:
+        n_numeric = len(self.feature_columns)
+        X = np.empty((len(data), n_numeric + len(self.categories)), dtype=np.float64)
+        X[:, :n_numeric] = data.reindex(columns=self.feature_columns, fill_value=0).to_numpy(dtype=np.float64, copy=False)
+        for j, (col, categories) in enumerate(self.categories.items(), start=n_numeric):
+            X[:, j] = pd.Categorical(data[col], categories=categories).codes
+        return X
 
     def train(self, features: pd.DataFrame, targets: pd.DataFrame):
-        """Train separate models for each pollutant and save feature columns."""
+        """Train separate models for each pollutant and save feature columns and categories."""
+        self.feature_columns = [col for col in features.columns if col not in CATEGORIES]
+        self.categories = CATEGORIES
+        X = self._build_features(features)
+
+        categorical_features = [False] * len(self.feature_columns) + [True] * len(self.categories)
         self.models = {
-            'co2': RandomForestRegressor(n_estimators=100, random_state=42),
-            'nox': RandomForestRegressor(n_estimators=100, random_state=42),
-            'al2o3': RandomForestRegressor(n_estimators=100, random_state=42)
+            'co2': HistGradientBoostingRegressor(max_bins=255, categorical_features=categorical_features, random_state=42),
+            'nox': HistGradientBoostingRegressor(max_bins=255, categorical_features=categorical_features, random_state=42),
+            'al2o3': HistGradientBoostingRegressor(max_bins=255, categorical_features=categorical_features, random_state=42)
         }
-        
-        for pollutant, model in self.models.items():
-            model.fit(features, targets[pollutant])
 
-        self.feature_columns = list(features.columns)
+        for pollutant, model in self.models.items():
+            model.fit(X, targets[pollutant])
         
         os.makedirs("models", exist_ok=True)
 
         for pollutant, model in self.models.items():
-            joblib.dump(model, f"models/{pollutant}_model.joblib")
+            joblib.dump(model, f"models/{pollutant}_model.joblib", compress=('lz4', 3))
         
         joblib.dump(self.feature_columns, "models/feature_columns.joblib")
+        joblib.dump(self.categories, "models/categories.joblib")
         print("✅ Model trained and saved successfully!")
 
     def load_models(self):
         try:
             self.feature_columns = joblib.load("models/feature_columns.joblib") 
+            self.categories = joblib.load("models/categories.joblib")
             for pollutant in ['co2', 'nox', 'al2o3']:
                 self.models[pollutant] = joblib.load(f"models/{pollutant}_model.joblib")
             print("✅ Models loaded successfully!")
@@ -41,28 +59,23 @@ class LaunchImpactModel:
             print(f"⚠️ Error loading models: {e}")
             self.models = {}
             self.feature_columns = None
+            self.categories = None
 
     def predict(self, input_data: pd.DataFrame, duration_hours: int = 24):
         if not self.models:
             raise ValueError("Models are not loaded. Call load_models() first.")
         
-        if self.feature_columns is None:
+        if self.feature_columns is None or self.categories is None:
             raise ValueError("Feature columns are missing. Ensure the model was trained correctly.")
 
-        for col in self.feature_columns:
-            if col not in input_data.columns:
-                input_data[col] = 0 
-        
-        input_data = input_data[self.feature_columns] 
+        X = self._build_features(input_data)
 
-        time_series_predictions = []
-        
-        for hour in range(duration_hours):
-            decay_factor = np.exp(-hour / 12.0)  
-            predictions = {pollutant: self.models[pollutant].predict(input_data)[0] * decay_factor for pollutant in self.models}
-            time_series_predictions.append(predictions)
-        
-        return pd.DataFrame(time_series_predictions) 
+        base = {pollutant: self.models[pollutant].predict(X)[0] for pollutant in self.models}
+
+        hours = np.arange(duration_hours)
+        decay = np.exp(-hours / 12.0)
+
+        return pd.DataFrame({pollutant: base[pollutant] * decay for pollutant in self.models})
 
 if __name__ == "__main__":
     model = LaunchImpactModel()
@@ -72,8 +85,8 @@ if __name__ == "__main__":
         'payload_mass': [5000],
         'launch_site_lat': [28.5729],
         'launch_site_lon': [-80.6490],
-        'rocket_type_Falcon 9': [1],
-        'fuel_type_RP-1/LOX': [1]
+        'rocket_type': ['Falcon 9'],
+        'fuel_type': ['RP-1/LOX']
     })
     
     predictions = model.predict(example_input)
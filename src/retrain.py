@@ -31,8 +31,6 @@ def preprocess_data(data: pd.DataFrame):
         'al2o3_concentration': 'al2o3'
     })
     
-    features = pd.get_dummies(features, columns=['fuel_type', 'rocket_type'], drop_first=True)
-    
     return features, targets
 
 def retrain_model():
@@ -1,20 +1,60 @@
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
-import json
 import os
 from dotenv import load_dotenv
 import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from cachetools import TTLCache
+import diskcache
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 load_dotenv()
+_API_KEY = os.getenv('OPENWEATHER_API_KEY', 'demo_key')
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+HEIGHTS = np.array([0, 50, 100, 200, 500])
+DISTANCES = np.array([100, 500, 1000, 2000, 5000])
+TIME_STEPS = np.arange(24)
+TIME_DECAY = np.exp(-TIME_STEPS / 10.0).astype(np.float32)
+_INV_2PI = 1.0 / (2.0 * math.pi)
+WEATHER_CACHE_TTL = 600
+WEATHER_CACHE_DIR = os.path.expanduser("~/.cache/ascent/weather")
+
+STABILITY_CLASSES = {
+    'A': {'a': 0.527, 'b': 0.865},
+    'B': {'a': 0.371, 'b': 0.866},
+    'C': {'a': 0.209, 'b': 0.897},
+    'D': {'a': 0.128, 'b': 0.905},
+    'E': {'a': 0.098, 'b': 0.902},
+    'F': {'a': 0.065, 'b': 0.902},
+}
+
+@lru_cache(maxsize=1024)
+def _unit_dispersion_grid(stability_class: str, wind_speed: float) -> np.ndarray:
+    """Unit-emission-rate concentrations over (time step, distance, height)."""
+    params = STABILITY_CLASSES[stability_class]
+    sigma = np.float32(params['a']) * DISTANCES.astype(np.float32) ** np.float32(params['b']) * np.float32(wind_speed / 5.0)
+    z_term = ((HEIGHTS.astype(np.float32)[None, :] - 50) / sigma[:, None]) ** 2
+    spatial = np.exp(-0.5 * z_term)
+    spatial *= (np.float32(1.0) / (np.float32(2 * np.pi * wind_speed) * sigma ** 2))[:, None]
+    grid = np.empty((len(TIME_STEPS),) + spatial.shape, dtype=np.float32)
+    np.multiply(TIME_DECAY[:, None, None], spatial, out=grid)
+    grid.setflags(write=False)
+    return grid
+
+@dataclass(slots=True, frozen=True)
 class WeatherCondition:
     temperature: float 
     pressure: float    
@@ -25,21 +65,57 @@ class WeatherCondition:
 
 class WeatherIntegrator:
     def __init__(self):
-        self.api_key = os.getenv('OPENWEATHER_API_KEY', 'demo_key')
+        self.api_key = _API_KEY
         self.base_url = "http://api.openweathermap.org/data/2.5"
+        self._url = f"{self.base_url}/weather"
+        self._base_params = {'appid': self.api_key, 'units': 'standard'}
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._cache = TTLCache(maxsize=128, ttl=WEATHER_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+        self._disk_cache = diskcache.Cache(WEATHER_CACHE_DIR)
+
+    def close(self):
+        self._session.close()
+        self._disk_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
         
     def get_current_weather(self, lat: float, lon: float) -> WeatherCondition:
+        key = (round(lat, 2), round(lon, 2))
+        with self._cache_lock:
+            weather = self._cache.get(key)
+        if weather is not None:
+            return weather
+        weather = self._disk_cache.get(key)
+        if weather is not None:
+            with self._cache_lock:
+                self._cache[key] = weather
+            return weather
+
+        weather = self._fetch_weather(lat, lon)
+        if weather is None:
+            return self._get_dummy_weather()
+        with self._cache_lock:
+            self._cache[key] = weather
+        self._disk_cache.set(key, weather, expire=WEATHER_CACHE_TTL)
+        return weather
+
+    def get_current_weather_batch(self, coords: List[Tuple[float, float]], max_workers: int = 8) -> List[WeatherCondition]:
+        """Fetch weather for several (lat, lon) pairs concurrently, preserving input order."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda c: self.get_current_weather(*c), coords))
+
+    def _fetch_weather(self, lat: float, lon: float) -> Optional[WeatherCondition]:
         try:
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'standard'  
-            }
-            response = requests.get(url, params=params)
+            params = {'lat': lat, 'lon': lon, **self._base_params}
+            response = self._session.get(self._url, params=params, timeout=5)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return WeatherCondition(
                 temperature=data['main']['temp'],
                 pressure=data['main']['pressure'],
@@ -48,9 +124,9 @@ class WeatherIntegrator:
                 wind_direction=data['wind'].get('deg', 0),
                 cloud_cover=data['clouds']['all']
             )
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error fetching weather data: {e}")
-            return self._get_dummy_weather()
+            return None
     
     def _get_dummy_weather(self) -> WeatherCondition:
         return WeatherCondition(
@@ -63,74 +139,82 @@ class WeatherIntegrator:
         )
 
 class DispersionCalculator:
+    _THRESH = np.array([2, 3, 5, 6, 8])
+    _CLASSES = np.array(['F', 'E', 'D', 'C', 'B', 'A'])
+
     def __init__(self):
-        self.stability_classes = {
-            'A': {'a': 0.527, 'b': 0.865},
-            'B': {'a': 0.371, 'b': 0.866},
-            'C': {'a': 0.209, 'b': 0.897},
-            'D': {'a': 0.128, 'b': 0.905},
-            'E': {'a': 0.098, 'b': 0.902},
-            'F': {'a': 0.065, 'b': 0.902},
-        }
+        self.stability_classes = STABILITY_CLASSES
     
     def determine_stability_class(self, weather: WeatherCondition) -> str:
-        if weather.wind_speed < 2:
-            return 'F'
-        elif weather.wind_speed < 3:
-            return 'E'
-        elif weather.wind_speed < 5:
-            return 'D'
-        elif weather.wind_speed < 6:
-            return 'C'
-        elif weather.wind_speed < 8:
-            return 'B'
-        else:
-            return 'A'
+        """Pasquill class from wind speed; accepts scalar or array wind speeds."""
+        classes = self._CLASSES[np.searchsorted(self._THRESH, np.asarray(weather.wind_speed), side='right')]
+        return classes.item() if np.ndim(classes) == 0 else classes
     
     def calculate_dispersion(self, weather: WeatherCondition, emission_rate: float, distance: float, time_step: int) -> Dict[str, float]:
         stability_class = self.determine_stability_class(weather)
         params = self.stability_classes[stability_class]
         wind_effect = weather.wind_speed / 5.0 
-        sigma_y = params['a'] * (distance ** params['b']) * wind_effect
-        sigma_z = params['a'] * (distance ** params['b']) * wind_effect  
+        sigma = params['a'] * (distance ** params['b']) * wind_effect
+        inv_sigma2 = 1.0 / (sigma * sigma)
         heights = [0, 50, 100, 200, 500]  
+        prefactor = emission_rate * _INV_2PI / weather.wind_speed * inv_sigma2
+        time_decay = math.exp(-time_step * 0.1)
         concentrations = {}
         for z in heights:
-            concentration = (emission_rate / (2 * np.pi * weather.wind_speed * sigma_y * sigma_z) *
-                            np.exp(-0.5 * (z - 50)**2 / sigma_z**2) * np.exp(-time_step / 10.0))  
+            concentration = prefactor * math.exp(-0.5 * (z - 50)**2 * inv_sigma2) * time_decay
             concentrations[f'{z}m'] = concentration  
         return concentrations
 
+    def unit_dispersion_grid(self, weather: WeatherCondition) -> np.ndarray:
+        """Cached, read-only unit-emission-rate grid over (time step, distance, height)."""
+        return _unit_dispersion_grid(self.determine_stability_class(weather), weather.wind_speed)
+
+    def calculate_dispersion_grid(self, weather: WeatherCondition, emission_rate: float) -> np.ndarray:
+        """Concentrations over (time step, distance, height) for TIME_STEPS, DISTANCES and HEIGHTS."""
+        return np.float32(emission_rate) * self.unit_dispersion_grid(weather)
+
+def to_nested_dict(pollutants: List[str], concentrations: np.ndarray) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+    """Expand a (pollutant, time, distance, height) array into the legacy nested-dict layout."""
+    hour_labels = [f'Hour {time_step}' for time_step in TIME_STEPS]
+    distance_labels = [f'{distance}m' for distance in DISTANCES]
+    height_labels = [f'{z}m' for z in HEIGHTS]
+    return {
+        pollutant: {
+            hour: {
+                distance: dict(zip(height_labels, levels))
+                for distance, levels in zip(distance_labels, hour_data)
+            }
+            for hour, hour_data in zip(hour_labels, pollutant_data)
+        }
+        for pollutant, pollutant_data in zip(pollutants, concentrations.tolist())
+    }
+
 class LaunchWeatherAnalyzer:
     def __init__(self):
         self.weather = WeatherIntegrator()
         self.dispersion = DispersionCalculator()
         
     def analyze_launch_conditions(self, lat: float, lon: float, predicted_emissions: Dict[str, float]) -> Dict[str, Any]:
+        """Weather at the site plus concentrations indexed by (pollutant, TIME_STEPS, DISTANCES, HEIGHTS)."""
         weather_conditions = self.weather.get_current_weather(lat, lon)
-        dispersion_patterns = {}
-        for pollutant, emission_rate in predicted_emissions.items():
-            distances = [100, 500, 1000, 2000, 5000]
-            patterns = {}
-            for time_step in range(24):
-                time_patterns = {}
-                for distance in distances:
-                    concentrations = self.dispersion.calculate_dispersion(
-                        weather_conditions,
-                        emission_rate,
-                        distance,
-                        time_step
-                    )
-                    time_patterns[f'{distance}m'] = concentrations
-                dispersion_patterns.setdefault(pollutant, {}).update({f'Hour {time_step}': time_patterns})
+        pollutants = list(predicted_emissions)
+        rates = np.fromiter(predicted_emissions.values(), dtype=np.float32, count=len(pollutants))
+        base = self.dispersion.unit_dispersion_grid(weather_conditions)
         return {
             'weather': weather_conditions,
-            'dispersion_patterns': dispersion_patterns
+            'pollutants': pollutants,
+            'concentrations': rates[:, None, None, None] * base
         }
 
+@lru_cache(maxsize=1)
+def get_analyzer() -> LaunchWeatherAnalyzer:
+    """Process-wide analyzer, so the HTTP session and weather cache are shared."""
+    return LaunchWeatherAnalyzer()
+
 if __name__ == "__main__":
-    analyzer = LaunchWeatherAnalyzer()
+    analyzer = get_analyzer()
     test_location = {'lat': 28.5729, 'lon': -80.6490}
     test_emissions = {'co2': 1000.0, 'nox': 50.0, 'al2o3': 10.0}
     results = analyzer.analyze_launch_conditions(test_location['lat'], test_location['lon'], test_emissions)
-    print(results)
+    print(results['weather'])
+    print(to_nested_dict(results['pollutants'], results['concentrations']))